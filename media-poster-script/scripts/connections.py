@@ -7,34 +7,45 @@ but use direct subprocess calls or module imports instead.
 """
 
 import asyncio
-import json
-import subprocess
+import functools
+import os
 from abc import ABC, abstractmethod
 from contextlib import AsyncExitStack
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional
+
+from stdio_protocol import (
+    FRAMING_ENV_VAR, PIPE_BUFFER_SIZE, WorkerPool, decode_frame, encode_frame, enlarge_pipe,
+    exchange, format_tool_result, load_server_module, process_running, raw_tool_response,
+    resolve_framing, stop_async_process,
+)
 
 
 class ConnectionBase(ABC):
     """Base class for connection handlers."""
 
-    def __init__(self):
-        self.session = None
-        self._stack = None
+    def __init__(self) -> None:
+        self.session: Any = None
+        self._stack: Optional[AsyncExitStack] = None
 
     @abstractmethod
-    def list_tools(self) -> List[Dict[str, Any]]:
+    async def list_tools(self) -> List[Dict[str, Any]]:
         """Retrieve available tools."""
 
     @abstractmethod
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool with arguments."""
 
-    async def __aenter__(self):
+    async def call_tool_raw(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Call a tool and return its result as text for a model."""
+        return format_tool_result(await self.call_tool(tool_name, arguments))
+
+    async def __aenter__(self) -> "ConnectionBase":
         """Async context manager entry."""
         return self
 
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
         """Async context manager exit."""
         pass
 
@@ -48,89 +59,161 @@ class StdioConnection(ConnectionBase):
         args: Optional[List[str]] = None,
         env: Optional[Dict[str, str]] = None,
         working_dir: Optional[Path] = None,
+        framing: Optional[str] = None,
     ):
         super().__init__()
         self.command = command
         self.args = args or []
         self.env = env or {}
         self.working_dir = working_dir
-        self._process: Optional[subprocess.Popen] = None
-
-    def _ensure_running(self):
-        """Ensure the server process is running."""
-        if self._process is None or self._process.poll() is not None:
-            import os
-
+        self.framing = resolve_framing(framing)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
+
+    async def _ensure_running_async(self) -> asyncio.subprocess.Process:
+        """Ensure the server process is running and return it."""
+        process = self._process
+        if process is None or not process_running(process):
+            if process is not None:
+                await stop_async_process(process)
             env = os.environ.copy()
             env.update(self.env)
-
-            self._process = subprocess.Popen(
-                [self.command] + self.args,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
+            env[FRAMING_ENV_VAR] = self.framing
+
+            process = self._process = await asyncio.create_subprocess_exec(
+                self.command,
+                *self.args,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
                 env=env,
                 cwd=self.working_dir,
+                limit=PIPE_BUFFER_SIZE,
             )
+            enlarge_pipe(process)
+        return process
 
-    def list_tools(self) -> List[Dict[str, Any]]:
-        """Retrieve available tools from the server."""
-        self._ensure_running()
+    @property
+    def running(self) -> bool:
+        """Whether the server process can take another request."""
+        return process_running(self._process)
 
-        request = json.dumps({"action": "list_tools"}) + "\n"
-        self._process.stdin.write(request)
-        self._process.stdin.flush()
+    async def start(self) -> None:
+        """Start the server process if it is not running."""
+        await self._ensure_running_async()
 
-        response_line = self._process.stdout.readline()
-        return json.loads(response_line)
+    async def _request(self, payload: Dict[str, Any]) -> bytes:
+        """Send a single request and return the undecoded response body."""
+        request = encode_frame(payload, self.framing)
 
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
-        """Call a tool on the server."""
-        self._ensure_running()
+        async with self._lock:
+            process = await self._ensure_running_async()
+            return await exchange(process, request, self.framing)
 
-        request = json.dumps({"tool": tool_name, "args": arguments}) + "\n"
-        self._process.stdin.write(request)
-        self._process.stdin.flush()
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Retrieve available tools from the server."""
+        return decode_frame(await self._request({"action": "list_tools"}), self.framing)
 
-        response_line = self._process.stdout.readline()
-        result = json.loads(response_line)
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool on the server."""
+        result = decode_frame(await self._request({"tool": tool_name, "args": arguments}), self.framing)
 
         if isinstance(result, dict) and "error" in result:
             raise RuntimeError(result["error"])
 
         return result
 
-    def stop(self):
+    async def call_tool_raw(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Call a tool and return its response text without decoding it."""
+        response = await self._request({"tool": tool_name, "args": arguments})
+        return raw_tool_response(response, self.framing)
+
+    async def stop(self) -> None:
         """Stop the server process."""
-        if self._process and self._process.poll() is None:
-            self._process.terminate()
-            try:
-                self._process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self._process.kill()
-                self._process.wait()
+        if self._process:
+            await stop_async_process(self._process)
         self._process = None
 
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Async context manager exit."""
+        await self.stop()
+
+
+class PooledStdioConnection(ConnectionBase):
+    """Stdio connection that spreads calls over several server processes."""
+
+    def __init__(
+        self,
+        command: str,
+        args: Optional[List[str]] = None,
+        env: Optional[Dict[str, str]] = None,
+        working_dir: Optional[Path] = None,
+        size: int = 4,
+        framing: Optional[str] = None,
+    ):
+        super().__init__()
+        self._pool: WorkerPool[StdioConnection] = WorkerPool(
+            [StdioConnection(command, args, env, working_dir, framing) for _ in range(max(1, size))]
+        )
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Retrieve available tools from any worker."""
+        return await self._pool.call(StdioConnection.list_tools)
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+        """Call a tool on the next idle worker."""
+        return await self._pool.call(StdioConnection.call_tool, tool_name, arguments)
+
+    async def call_tool_raw(self, tool_name: str, arguments: Dict[str, Any]) -> str:
+        """Call a tool on the next idle worker without decoding its response."""
+        return await self._pool.call(StdioConnection.call_tool_raw, tool_name, arguments)
+
+    async def stop(self) -> None:
+        """Stop all worker processes."""
+        await self._pool.stop()
+
+    async def __aenter__(self) -> "PooledStdioConnection":
+        """Start all worker processes up front."""
+        await self._pool.start()
+        return self
+
+    async def __aexit__(self, exc_type: Any, exc_val: Any, exc_tb: Any) -> None:
+        """Async context manager exit."""
+        await self.stop()
+
 
 class DirectConnection(ConnectionBase):
     """Connection using direct module imports (no MCP protocol)."""
 
-    def __init__(self, module_path: str, server_instance=None):
+    def __init__(self, module_path: str, server_instance: Any = None) -> None:
         super().__init__()
         self.module_path = module_path
         self.server = server_instance
-        self._module = None
+        # tool name -> callable taking the tool's argument dict
+        self._tool_cache: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
 
-    def _load_module(self):
+    def _load_module(self) -> ModuleType:
         """Load the server module."""
-        import importlib
+        return load_server_module(self.module_path)
+
+    def _resolve_tool(self, tool_name: str) -> Callable[[Dict[str, Any]], Any]:
+        """Resolve a tool name to a callable once and cache it."""
+        module = self._load_module()
 
-        if not self._module:
-            self._module = importlib.import_module(self.module_path)
-        return self._module
+        # Try module-level function
+        func = getattr(module, tool_name, None)
+        if callable(func):
+            resolved = lambda arguments: func(**arguments)
+        # Try call_tool function
+        elif hasattr(module, "call_tool"):
+            resolved = functools.partial(module.call_tool, tool_name)
+        else:
+            raise ValueError(f"Tool '{tool_name}' not found in module '{self.module_path}'")
 
-    def list_tools(self) -> List[Dict[str, Any]]:
+        self._tool_cache[tool_name] = resolved
+        return resolved
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
         """Retrieve available tools from the module."""
         module = self._load_module()
 
@@ -143,31 +226,21 @@ class DirectConnection(ConnectionBase):
 
         return []
 
-    def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Any:
         """Call a tool directly on the module."""
-        module = self._load_module()
-
-        # Try module-level function
-        if hasattr(module, tool_name):
-            func = getattr(module, tool_name)
-            if callable(func):
-                return func(**arguments)
-
-        # Try call_tool function
-        if hasattr(module, "call_tool"):
-            return module.call_tool(tool_name, arguments)
-
-        raise ValueError(f"Tool '{tool_name}' not found in module '{self.module_path}'")
+        func = self._tool_cache.get(tool_name) or self._resolve_tool(tool_name)
+        return func(arguments)
 
 
 def create_connection(
     transport: str,
-    command: str = None,
-    args: List[str] = None,
-    env: Dict[str, str] = None,
-    url: str = None,
-    headers: Dict[str, str] = None,
-    module_path: str = None,
+    command: Optional[str] = None,
+    args: Optional[List[str]] = None,
+    env: Optional[Dict[str, str]] = None,
+    url: Optional[str] = None,
+    headers: Optional[Dict[str, str]] = None,
+    module_path: Optional[str] = None,
+    pool_size: int = 1,
 ) -> ConnectionBase:
     """
     Factory function to create the appropriate connection.
@@ -180,6 +253,7 @@ def create_connection(
         url: Server URL (not used in script-based mode)
         headers: HTTP headers (not used in script-based mode)
         module_path: Module path for direct import
+        pool_size: Number of server processes to run (stdio only)
 
     Returns:
         Connection instance
@@ -189,6 +263,8 @@ def create_connection(
     if transport == "stdio":
         if not command:
             raise ValueError("Command is required for stdio transport")
+        if pool_size > 1:
+            return PooledStdioConnection(command=command, args=args, env=env, size=pool_size)
         return StdioConnection(command=command, args=args, env=env)
 
     elif transport == "direct":
@@ -206,7 +282,7 @@ def create_connection(
         raise ValueError(f"Unsupported transport type: {transport}. Use 'stdio' or 'direct'")
 
 
-def main():
+def main() -> Optional[int]:
     """CLI interface for connection testing."""
     import argparse
 
@@ -225,9 +301,13 @@ def main():
             conn = create_connection("direct", module_path=args.module)
         else:
             parser.print_help()
-            return
+            return None
+
+        async def _list_tools() -> List[Dict[str, Any]]:
+            async with conn:
+                return await conn.list_tools()
 
-        tools = conn.list_tools()
+        tools = asyncio.run(_list_tools())
         print(f"Found {len(tools)} tools:")
         for tool in tools:
             print(f"  - {tool.get('name', 'unknown')}")
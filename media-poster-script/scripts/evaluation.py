@@ -8,16 +8,25 @@ Replaces MCP ClientSession with direct subprocess calls and Claude API.
 
 import argparse
 import asyncio
-import json
-import re
+import functools
+import importlib.util
+import io
+import os
 import sys
 import time
-import traceback
-import xml.etree.ElementTree as ET
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from types import ModuleType
+from typing import Any, Callable, Dict, Iterator, List, Optional, TextIO
 
-from anthropic import Anthropic
+from anthropic import DEFAULT_CONNECTION_LIMITS, AsyncAnthropic, DefaultAsyncHttpxClient
+from anthropic.types import MessageParam, ToolParam
+
+from stdio_protocol import (
+    FRAMING_ENV_VAR, PIPE_BUFFER_SIZE, WorkerPool, decode_frame, dumps_pretty, encode_frame,
+    enlarge_pipe, exchange, format_tool_result, load_server_module, process_running,
+    raw_tool_response, resolve_framing, stop_async_process,
+)
 
 
 EVALUATION_PROMPT = """You are an AI assistant with access to tools.
@@ -46,22 +55,47 @@ Response Requirements:
 
 
 def parse_evaluation_file(file_path: Path) -> List[Dict[str, Any]]:
-    """Parse XML evaluation file with qa_pair elements."""
+    """Parse XML evaluation file with qa_pair elements.
+
+    The file is streamed with iterparse and each qa_pair is discarded once
+    read, so memory stays flat for large evaluation suites.
+    """
+    events: Iterator[Any]
     try:
-        tree = ET.parse(file_path)
-        root = tree.getroot()
+        # Parsers are imported here rather than at module load to keep CLI
+        # startup fast; lxml is used when installed.
+        try:
+            from lxml import etree  # type: ignore[import-untyped]
+
+            events = etree.iterparse(str(file_path), events=("end",), tag="qa_pair")
+            use_lxml = True
+        except ImportError:
+            import xml.etree.ElementTree as ET
+
+            events = ET.iterparse(file_path, events=("end",))
+            use_lxml = False
+
         evaluations = []
 
-        for qa_pair in root.findall(".//qa_pair"):
-            question_elem = qa_pair.find("question")
-            answer_elem = qa_pair.find("answer")
+        for _, qa_pair in events:
+            if qa_pair.tag != "qa_pair":
+                continue
+
+            question = qa_pair.findtext("question")
+            answer = qa_pair.findtext("answer")
 
-            if question_elem is not None and answer_elem is not None:
+            if question is not None and answer is not None:
                 evaluations.append({
-                    "question": (question_elem.text or "").strip(),
-                    "answer": (answer_elem.text or "").strip(),
+                    "question": question.strip(),
+                    "answer": answer.strip(),
                 })
 
+            qa_pair.clear()
+            if use_lxml:
+                # Drop already-processed siblings still referenced by the parent
+                while qa_pair.getprevious() is not None:
+                    del qa_pair.getparent()[0]
+
         return evaluations
     except Exception as e:
         print(f"Error parsing evaluation file {file_path}: {e}")
@@ -69,10 +103,15 @@ def parse_evaluation_file(file_path: Path) -> List[Dict[str, Any]]:
 
 
 def extract_xml_content(text: str, tag: str) -> Optional[str]:
-    """Extract content from XML tags."""
-    pattern = rf"<{tag}>(.*?)</{tag}>"
-    matches = re.findall(pattern, text, re.DOTALL)
-    return matches[-1].strip() if matches else None
+    """Extract content from the last occurrence of an XML tag."""
+    open_tag, close_tag = f"<{tag}>", f"</{tag}>"
+    end = text.rfind(close_tag)
+    if end < 0:
+        return None
+    start = text.rfind(open_tag, 0, end)
+    if start < 0:
+        return None
+    return text[start + len(open_tag):end].strip()
 
 
 class ScriptBasedToolCaller:
@@ -83,6 +122,7 @@ class ScriptBasedToolCaller:
         command: str,
         args: Optional[List[str]] = None,
         env: Optional[Dict[str, str]] = None,
+        framing: Optional[str] = None,
     ):
         """
         Initialize the script-based tool caller.
@@ -91,62 +131,61 @@ class ScriptBasedToolCaller:
             command: Executable command to run the server
             args: Command arguments
             env: Environment variables
+            framing: Wire framing ("line", "length" or "msgpack"); defaults to
+                $MEDIA_POSTER_FRAMING, then "line"
         """
         self.command = command
         self.args = args or []
         self.env = env or {}
-        self._process = None
+        self.framing = resolve_framing(framing)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._lock = asyncio.Lock()
 
-    def start(self) -> None:
+    async def start(self) -> None:
         """Start the server process."""
-        import os
-
         env = os.environ.copy()
         env.update(self.env)
-
-        self._process = subprocess.Popen(
-            [self.command] + self.args,
-            stdin=subprocess.PIPE,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+        env[FRAMING_ENV_VAR] = self.framing
+
+        self._process = await asyncio.create_subprocess_exec(
+            self.command,
+            *self.args,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
             env=env,
+            limit=PIPE_BUFFER_SIZE,
         )
+        enlarge_pipe(self._process)
+
+    @property
+    def running(self) -> bool:
+        """Whether the server process can take another request."""
+        return process_running(self._process)
 
-    def stop(self) -> None:
+    async def stop(self) -> None:
         """Stop the server process."""
-        if self._process and self._process.poll() is None:
-            self._process.terminate()
-            try:
-                self._process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self._process.kill()
-                self._process.wait()
+        if self._process:
+            await stop_async_process(self._process)
         self._process = None
 
-    def list_tools(self) -> List[Dict[str, Any]]:
-        """Get available tools from the server."""
-        if not self._process:
-            raise RuntimeError("Server not running")
+    async def _request(self, payload: Dict[str, Any]) -> bytes:
+        """Send a single request and return the undecoded response body."""
+        request = encode_frame(payload, self.framing)
 
-        request = json.dumps({"action": "list_tools"}) + "\n"
-        self._process.stdin.write(request)
-        self._process.stdin.flush()
+        async with self._lock:
+            process = self._process
+            if process is None or not process_running(process):
+                raise RuntimeError("Server not running")
+            return await exchange(process, request, self.framing)
 
-        response_line = self._process.stdout.readline()
-        return json.loads(response_line)
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Get available tools from the server."""
+        return decode_frame(await self._request({"action": "list_tools"}), self.framing)
 
-    def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+    async def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
         """Call a tool on the server."""
-        if not self._process:
-            raise RuntimeError("Server not running")
-
-        request = json.dumps({"tool": tool_name, "args": args}) + "\n"
-        self._process.stdin.write(request)
-        self._process.stdin.flush()
-
-        response_line = self._process.stdout.readline()
-        result = json.loads(response_line)
+        result = decode_frame(await self._request({"tool": tool_name, "args": args}), self.framing)
 
         # Handle error responses
         if isinstance(result, dict) and "error" in result:
@@ -154,23 +193,89 @@ class ScriptBasedToolCaller:
 
         return result
 
+    async def call_tool_raw(self, tool_name: str, args: Dict[str, Any]) -> str:
+        """Call a tool and return its response text without decoding it."""
+        response = await self._request({"tool": tool_name, "args": args})
+        return raw_tool_response(response, self.framing)
+
+
+class ScriptBasedToolCallerPool:
+    """Spread tool calls over several script-based server processes."""
+
+    def __init__(
+        self,
+        command: str,
+        args: Optional[List[str]] = None,
+        env: Optional[Dict[str, str]] = None,
+        size: int = 4,
+        framing: Optional[str] = None,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            command: Executable command to run the server
+            args: Command arguments
+            env: Environment variables
+            size: Number of server processes to keep running
+            framing: Wire framing ("line", "length" or "msgpack"); defaults to
+                $MEDIA_POSTER_FRAMING, then "line"
+        """
+        self._pool: WorkerPool[ScriptBasedToolCaller] = WorkerPool(
+            [ScriptBasedToolCaller(command, args, env, framing) for _ in range(max(1, size))]
+        )
+
+    async def start(self) -> None:
+        """Start all server processes."""
+        await self._pool.start()
+
+    async def stop(self) -> None:
+        """Stop all server processes."""
+        await self._pool.stop()
+
+    async def list_tools(self) -> List[Dict[str, Any]]:
+        """Get available tools from any server."""
+        return await self._pool.call(ScriptBasedToolCaller.list_tools)
+
+    async def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+        """Call a tool on the next idle server."""
+        return await self._pool.call(ScriptBasedToolCaller.call_tool, tool_name, args)
+
+    async def call_tool_raw(self, tool_name: str, args: Dict[str, Any]) -> str:
+        """Call a tool on the next idle server without decoding its response."""
+        return await self._pool.call(ScriptBasedToolCaller.call_tool_raw, tool_name, args)
+
 
 class DirectToolCaller:
     """Call tools through direct module imports."""
 
     def __init__(self, module_path: str):
         self.module_path = module_path
-        self._module = None
+        # tool name -> callable taking the tool's argument dict
+        self._tool_cache: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
 
-    def _load_module(self):
+    def _load_module(self) -> ModuleType:
         """Load the server module."""
-        import importlib
+        return load_server_module(self.module_path)
+
+    def _resolve_tool(self, tool_name: str) -> Callable[[Dict[str, Any]], Any]:
+        """Resolve a tool name to a callable once and cache it."""
+        module = self._load_module()
+
+        # Try module-level function
+        func = getattr(module, tool_name, None)
+        if callable(func):
+            resolved = lambda args: func(**args)
+        # Try call_tool function
+        elif hasattr(module, "call_tool"):
+            resolved = functools.partial(module.call_tool, tool_name)
+        else:
+            raise ValueError(f"Tool {tool_name} not found in {self.module_path}")
 
-        if not self._module:
-            self._module = importlib.import_module(self.module_path)
-        return self._module
+        self._tool_cache[tool_name] = resolved
+        return resolved
 
-    def list_tools(self) -> List[Dict[str, Any]]:
+    async def list_tools(self) -> List[Dict[str, Any]]:
         """Get available tools from the module."""
         module = self._load_module()
 
@@ -183,35 +288,98 @@ class DirectToolCaller:
 
         return []
 
-    def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
+    async def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
         """Call a tool directly on the module."""
-        module = self._load_module()
+        func = self._tool_cache.get(tool_name) or self._resolve_tool(tool_name)
+        return func(args)
+
+    async def call_tool_raw(self, tool_name: str, args: Dict[str, Any]) -> str:
+        """Call a tool and return its result as text for a model."""
+        return format_tool_result(await self.call_tool(tool_name, args))
+
+
+@dataclass
+class ToolStat:
+    """Running duration statistics for one tool, kept in constant memory."""
+
+    count: int = 0
+    total_ns: int = 0
+    min_ns: int = 0
+    max_ns: int = 0
+
+    def record(self, duration_ns: int) -> None:
+        """Add one call's duration (nanoseconds) to the statistics."""
+        self.count += 1
+        self.total_ns += duration_ns
+        if self.count == 1 or duration_ns < self.min_ns:
+            self.min_ns = duration_ns
+        if duration_ns > self.max_ns:
+            self.max_ns = duration_ns
+
+    def to_report(self) -> Dict[str, Any]:
+        """Return the statistics with durations in seconds."""
+        return {
+            "count": self.count,
+            "total_duration": self.total_ns / 1e9,
+            "min_duration": self.min_ns / 1e9,
+            "max_duration": self.max_ns / 1e9,
+        }
+
+
+def create_client() -> AsyncAnthropic:
+    """
+    Create an async Anthropic client with a shared keep-alive connection pool.
+
+    HTTP/2 is used when the optional ``h2`` package is installed, so
+    concurrent tasks multiplex over a few connections instead of opening
+    a new TLS session per request.
+    """
+    http2 = importlib.util.find_spec("h2") is not None
+
+    # The SDK's HTTP client may come from httpx or its httpx2 fork depending
+    # on the anthropic version, so the limits use the SDK's own Limits type.
+    limits_type = type(DEFAULT_CONNECTION_LIMITS)
+    http_client = DefaultAsyncHttpxClient(
+        http2=http2,
+        limits=limits_type(max_keepalive_connections=64, max_connections=128, keepalive_expiry=90),
+    )
+    return AsyncAnthropic(http_client=http_client)
 
-        # Try module-level function
-        if hasattr(module, tool_name):
-            func = getattr(module, tool_name)
-            if callable(func):
-                return func(**args)
 
-        # Try call_tool function
-        if hasattr(module, "call_tool"):
-            return module.call_tool(tool_name, args)
+def _format_tool_error(tool_name: str, error: Exception, verbose: bool = False) -> str:
+    """
+    Describe a failed tool call for the model.
 
-        raise ValueError(f"Tool {tool_name} not found in {self.module_path}")
+    Only the exception and the frame that raised it are reported unless
+    verbose is set, which keeps tracebacks out of the model context.
+    """
+    import traceback
+
+    if verbose:
+        return f"Error executing tool {tool_name}: {error}\n" + "".join(traceback.format_exception(error))
+
+    message = f"Error executing tool {tool_name}: {type(error).__name__}: {error}"
+    last = None
+    for last in traceback.walk_tb(error.__traceback__):
+        pass
+    if last is not None:
+        frame, lineno = last
+        message += f" at {frame.f_code.co_filename}:{lineno}"
+    return message
 
 
 async def agent_loop(
-    client: Anthropic,
+    client: AsyncAnthropic,
     model: str,
     question: str,
-    tools: List[Dict[str, Any]],
+    tools: List[ToolParam],
     tool_caller: Any,
-) -> tuple[str, Dict[str, Any]]:
+    verbose: bool = False,
+) -> tuple[Optional[str], Dict[str, ToolStat]]:
     """Run the agent loop with script-based tool calling."""
-    messages = [{"role": "user", "content": question}]
+    messages: List[MessageParam] = [{"role": "user", "content": question}]
 
-    response = await asyncio.to_thread(
-        client.messages.create,
+    response = await client.messages.create(
         model=model,
         max_tokens=4096,
         system=EVALUATION_PROMPT,
@@ -221,26 +389,29 @@ async def agent_loop(
 
     messages.append({"role": "assistant", "content": response.content})
 
-    tool_metrics = {}
+    tool_metrics: Dict[str, ToolStat] = {}
+    # Servers that return JSON text can hand it to the model unparsed.
+    call_tool_raw = getattr(tool_caller, "call_tool_raw", None)
 
     while response.stop_reason == "tool_use":
         tool_use = next(block for block in response.content if block.type == "tool_use")
         tool_name = tool_use.name
         tool_input = tool_use.input
 
-        tool_start_ts = time.time()
+        tool_start_ns = time.perf_counter_ns()
         try:
-            tool_result = tool_caller.call_tool(tool_name, tool_input)
-            tool_response = json.dumps(tool_result) if isinstance(tool_result, (dict, list)) else str(tool_result)
+            if call_tool_raw is not None:
+                tool_response = await call_tool_raw(tool_name, tool_input)
+            else:
+                tool_response = format_tool_result(await tool_caller.call_tool(tool_name, tool_input))
         except Exception as e:
-            tool_response = f"Error executing tool {tool_name}: {str(e)}\n"
-            tool_response += traceback.format_exc()
-        tool_duration = time.time() - tool_start_ts
+            tool_response = _format_tool_error(tool_name, e, verbose)
+        tool_duration_ns = time.perf_counter_ns() - tool_start_ns
 
-        if tool_name not in tool_metrics:
-            tool_metrics[tool_name] = {"count": 0, "durations": []}
-        tool_metrics[tool_name]["count"] += 1
-        tool_metrics[tool_name]["durations"].append(tool_duration)
+        stat = tool_metrics.get(tool_name)
+        if stat is None:
+            stat = tool_metrics[tool_name] = ToolStat()
+        stat.record(tool_duration_ns)
 
         messages.append({
             "role": "user",
@@ -251,8 +422,7 @@ async def agent_loop(
             }]
         })
 
-        response = await asyncio.to_thread(
-            client.messages.create,
+        response = await client.messages.create(
             model=model,
             max_tokens=4096,
             system=EVALUATION_PROMPT,
@@ -269,32 +439,34 @@ async def agent_loop(
 
 
 async def evaluate_single_task(
-    client: Anthropic,
+    client: AsyncAnthropic,
     model: str,
     qa_pair: Dict[str, Any],
-    tools: List[Dict[str, Any]],
+    tools: List[ToolParam],
     tool_caller: Any,
     task_index: int,
+    verbose: bool = False,
 ) -> Dict[str, Any]:
     """Evaluate a single QA pair."""
-    start_time = time.time()
+    start_ns = time.perf_counter_ns()
 
     print(f"Task {task_index + 1}: {qa_pair['question'][:60]}...")
-    response, tool_metrics = await agent_loop(client, model, qa_pair["question"], tools, tool_caller)
+    response, tool_metrics = await agent_loop(client, model, qa_pair["question"], tools, tool_caller, verbose)
 
+    response = response or ""
     response_value = extract_xml_content(response, "response")
     summary = extract_xml_content(response, "summary")
 
-    duration_seconds = time.time() - start_time
+    duration_ns = time.perf_counter_ns() - start_ns
 
     return {
         "question": qa_pair["question"],
         "expected": qa_pair["answer"],
         "actual": response_value,
         "score": int(response_value == qa_pair["answer"]) if response_value else 0,
-        "total_duration": duration_seconds,
+        "total_duration_ns": duration_ns,
         "tool_calls": tool_metrics,
-        "num_tool_calls": sum(len(metrics["durations"]) for metrics in tool_metrics.values()),
+        "num_tool_calls": sum(stat.count for stat in tool_metrics.values()),
         "summary": summary,
     }
 
@@ -328,64 +500,106 @@ TASK_TEMPLATE = """
 ---
 """
 
+# Bound once so each task skips the attribute lookup and kwargs repacking.
+_format_task = TASK_TEMPLATE.format_map
+
 
 async def run_evaluation(
     eval_path: Path,
     tool_caller: Any,
     model: str = "claude-3-7-sonnet-20250219",
+    concurrency: int = 8,
+    client: Optional[AsyncAnthropic] = None,
+    verbose: bool = False,
 ) -> str:
-    """Run evaluation with script-based tool calling."""
+    """Run evaluation with script-based tool calling.
+
+    Up to ``concurrency`` tasks are evaluated at the same time; results
+    keep the order of the evaluation file. When no client is given, one is
+    created with create_client() and closed before returning. With verbose
+    set, tool errors include the full traceback.
+    """
     print("Starting Evaluation")
 
-    client = Anthropic()
+    owns_client = client is None
+    api_client = client if client is not None else create_client()
 
-    tools = tool_caller.list_tools()
+    tools = await tool_caller.list_tools()
     print(f"Loaded {len(tools)} tools")
 
     qa_pairs = parse_evaluation_file(eval_path)
     print(f"Loaded {len(qa_pairs)} evaluation tasks")
 
-    results = []
-    for i, qa_pair in enumerate(qa_pairs):
-        print(f"Processing task {i + 1}/{len(qa_pairs)}")
-        result = await evaluate_single_task(client, model, qa_pair, tools, tool_caller, i)
-        results.append(result)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
 
-    correct = sum(r["score"] for r in results)
+    async def _run(i: int, qa_pair: Dict[str, Any]) -> Dict[str, Any]:
+        async with semaphore:
+            print(f"Processing task {i + 1}/{len(qa_pairs)}")
+            return await evaluate_single_task(api_client, model, qa_pair, tools, tool_caller, i, verbose)
+
+    tasks = [asyncio.ensure_future(_run(i, qa_pair)) for i, qa_pair in enumerate(qa_pairs)]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # gather() leaves the other tasks running when one fails; stop them
+        # before the client and tool server are closed underneath them.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    finally:
+        if owns_client:
+            await api_client.close()
+
+    report = io.StringIO()
+    write_report(report, qa_pairs, results)
+    return report.getvalue()
+
+
+def _summarize_results(results: List[Dict[str, Any]]) -> tuple[int, int, int]:
+    """Return (correct, total duration in ns, total tool calls) in one pass."""
+    correct = 0
+    total_duration_ns = 0
+    total_tool_calls = 0
+    for result in results:
+        correct += result["score"]
+        total_duration_ns += result["total_duration_ns"]
+        total_tool_calls += result["num_tool_calls"]
+    return correct, total_duration_ns, total_tool_calls
+
+
+def write_report(out: TextIO, qa_pairs: List[Dict[str, Any]], results: List[Dict[str, Any]]) -> None:
+    """Write the evaluation report to a text stream, one task at a time."""
+    correct, total_duration_ns, total_tool_calls = _summarize_results(results)
     accuracy = (correct / len(results)) * 100 if results else 0
-    average_duration_s = sum(r["total_duration"] for r in results) / len(results) if results else 0
-    average_tool_calls = sum(r["num_tool_calls"] for r in results) / len(results) if results else 0
-    total_tool_calls = sum(r["num_tool_calls"] for r in results)
+    average_duration_s = total_duration_ns / 1e9 / len(results) if results else 0
+    average_tool_calls = total_tool_calls / len(results) if results else 0
 
-    report = REPORT_HEADER.format(
+    out.write(REPORT_HEADER.format(
         correct=correct,
         total=len(results),
         accuracy=accuracy,
         average_duration_s=average_duration_s,
         average_tool_calls=average_tool_calls,
         total_tool_calls=total_tool_calls,
-    )
+    ))
 
-    report += "".join([
-        TASK_TEMPLATE.format(
-            task_num=i + 1,
-            question=qa_pair["question"],
-            expected_answer=qa_pair["answer"],
-            actual_answer=result["actual"] or "N/A",
-            correct_indicator="PASS" if result["score"] else "FAIL",
-            total_duration=result["total_duration"],
-            tool_calls=json.dumps(result["tool_calls"], indent=2),
-            summary=result["summary"] or "N/A",
-        )
-        for i, (qa_pair, result) in enumerate(zip(qa_pairs, results))
-    ])
-
-    return report
+    for i, (qa_pair, result) in enumerate(zip(qa_pairs, results)):
+        out.write(_format_task({
+            "task_num": i + 1,
+            "question": qa_pair["question"],
+            "expected_answer": qa_pair["answer"],
+            "actual_answer": result["actual"] or "N/A",
+            "correct_indicator": "PASS" if result["score"] else "FAIL",
+            "total_duration": result["total_duration_ns"] / 1e9,
+            "tool_calls": dumps_pretty({name: stat.to_report() for name, stat in result["tool_calls"].items()}),
+            "summary": result["summary"] or "N/A",
+        }))
 
 
 def parse_headers(header_list: List[str]) -> Dict[str, str]:
     """Parse header strings in format 'Key: Value' into a dictionary."""
-    headers = {}
+    headers: Dict[str, str] = {}
     if not header_list:
         return headers
 
@@ -398,7 +612,7 @@ def parse_headers(header_list: List[str]) -> Dict[str, str]:
 
 def parse_env_vars(env_list: List[str]) -> Dict[str, str]:
     """Parse environment variable strings in format 'KEY=VALUE' into a dictionary."""
-    env = {}
+    env: Dict[str, str] = {}
     if not env_list:
         return env
 
@@ -409,7 +623,7 @@ def parse_env_vars(env_list: List[str]) -> Dict[str, str]:
     return env
 
 
-async def main():
+async def main() -> None:
     parser = argparse.ArgumentParser(
         description="Evaluate MCP servers using script-based tool calling",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -433,11 +647,21 @@ Examples:
     stdio_group.add_argument("-c", "--command", help="Command to run server")
     stdio_group.add_argument("-a", "--args", nargs="+", help="Arguments for the command")
     stdio_group.add_argument("-e", "--env", nargs="+", help="Environment variables in KEY=VALUE format")
+    stdio_group.add_argument(
+        "-p", "--pool-size", type=int, default=1,
+        help="Number of server processes sharing tool calls (e.g. match --concurrency)",
+    )
 
     direct_group = parser.add_argument_group("direct import options")
     direct_group.add_argument("--module", help="Module path for direct import (e.g., media_poster.server)")
 
     parser.add_argument("-o", "--output", type=Path, help="Output file for report")
+    parser.add_argument(
+        "-v", "--verbose", action="store_true", help="Include full tracebacks in tool error messages"
+    )
+    parser.add_argument(
+        "-j", "--concurrency", type=int, default=8, help="Maximum number of tasks to evaluate concurrently (default: 8)"
+    )
 
     args = parser.parse_args()
 
@@ -446,23 +670,33 @@ Examples:
         sys.exit(1)
 
     # Create appropriate tool caller
+    tool_caller: Any
     if args.module:
         tool_caller = DirectToolCaller(args.module)
     elif args.command:
         env_vars = parse_env_vars(args.env) if args.env else {}
-        tool_caller = ScriptBasedToolCaller(command=args.command, args=args.args, env=env_vars)
+        if args.pool_size > 1:
+            tool_caller = ScriptBasedToolCallerPool(
+                command=args.command, args=args.args, env=env_vars, size=args.pool_size
+            )
+        else:
+            tool_caller = ScriptBasedToolCaller(command=args.command, args=args.args, env=env_vars)
     else:
         print("Error: Either --command or --module must be specified")
         sys.exit(1)
 
     print(f"Starting evaluation with {args.eval_file}")
 
+    client = create_client()
+
     try:
         if hasattr(tool_caller, "start"):
-            tool_caller.start()
+            await tool_caller.start()
             print("Server started")
 
-        report = await run_evaluation(args.eval_file, tool_caller, args.model)
+        report = await run_evaluation(
+            args.eval_file, tool_caller, args.model, args.concurrency, client, args.verbose
+        )
 
         if args.output:
             args.output.write_text(report)
@@ -471,8 +705,9 @@ Examples:
             print("\n" + report)
 
     finally:
+        await client.close()
         if hasattr(tool_caller, "stop"):
-            tool_caller.stop()
+            await tool_caller.stop()
             print("Server stopped")
 
 
@@ -6,12 +6,92 @@ This module provides process management for running MCP servers
 as standalone subprocesses without MCP protocol connections.
 """
 
+import argparse
 import asyncio
-import json
+import functools
+import inspect
+import os
 import subprocess
-from contextlib import AsyncExitStack, contextmanager
+from collections import deque
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Any, AsyncGenerator, ContextManager, Dict, List, Optional
+from types import ModuleType
+from typing import Any, Callable, ContextManager, Deque, Dict, List, Optional, Sequence, Tuple
+
+from stdio_protocol import (
+    CLOSE_FDS, FRAMING_ENV_VAR, LIST_TOOLS_FRAMES, PIPE_BUFFER_SIZE, STDERR_TAIL_LINES, WorkerPool,
+    decode_frame, encode_frame_parts, load_server_module, msgpack_encoder, read_frame,
+    resolve_executable, resolve_framing, start_stderr_drain, stop_process,
+)
+from tool_registry import TOOL_REGISTRY
+
+
+def _write_all(fd: int, data: bytes) -> None:
+    """Write all of data to a blocking pipe descriptor."""
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+
+def _writev_all(fd: int, parts: Sequence[bytes]) -> None:
+    """Write parts to a blocking pipe descriptor without joining them first."""
+    if not hasattr(os, "writev"):
+        _write_all(fd, b"".join(parts))
+        return
+    written = os.writev(fd, parts)
+    if written < sum(len(part) for part in parts):
+        # Short write (e.g. interrupted by a signal); finish the remainder.
+        _write_all(fd, b"".join(parts)[written:])
+
+
+class _PipeReader:
+    """Frame reader over a raw pipe descriptor with a carried-over buffer."""
+
+    def __init__(self, fd: int, chunk_size: int = 1 << 16):
+        self.fd = fd
+        self.chunk_size = chunk_size
+        self.buffer = bytearray()
+
+    def _fill(self) -> None:
+        """Append the next chunk from the pipe to the buffer."""
+        chunk = os.read(self.fd, self.chunk_size)
+        if not chunk:
+            raise EOFError("Server closed its stdout")
+        self.buffer += chunk
+
+    def _take(self, size: int) -> bytes:
+        """Remove and return the first size bytes of the buffer."""
+        frame = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return frame
+
+    def read_line(self) -> bytes:
+        """Read up to and including the next newline."""
+        scanned = 0
+        while True:
+            end = self.buffer.find(b"\n", scanned)
+            if end >= 0:
+                return self._take(end + 1)
+            scanned = len(self.buffer)
+            self._fill()
+
+    def read_exactly(self, size: int) -> bytes:
+        """Read exactly size bytes."""
+        while len(self.buffer) < size:
+            self._fill()
+        return self._take(size)
+
+    def read_frame(self, framing: str) -> bytes:
+        """Read one message body from the pipe."""
+        if framing == "line":
+            return self.read_line()
+        header = self.read_exactly(4)
+        return self.read_exactly(int.from_bytes(header, "little"))
+
+
+# Environment inherited by server processes, snapshotted once instead of
+# copying os.environ on every start. See ServerRunner.refresh_env.
+_BASE_ENV = os.environ.copy()
 
 
 class ServerRunner:
@@ -23,6 +103,8 @@ class ServerRunner:
         args: Optional[List[str]] = None,
         env: Optional[Dict[str, str]] = None,
         working_dir: Optional[Path] = None,
+        framing: Optional[str] = None,
+        capture_stderr: bool = False,
     ):
         """
         Initialize the server runner.
@@ -32,13 +114,73 @@ class ServerRunner:
             args: Arguments to pass to the command
             env: Environment variables for the server
             working_dir: Working directory for the server process
+            framing: Wire framing ("line", "length" or "msgpack"); defaults
+                to $MEDIA_POSTER_FRAMING, then "line"
+            capture_stderr: Keep the server's last stderr lines in
+                stderr_tail instead of discarding them
         """
         self.command = command
         self.args = args or []
         self.env = env or {}
         self.working_dir = working_dir
+        self.framing = resolve_framing(framing)
+        self.capture_stderr = capture_stderr
+        self.stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        # Reused for every tool call; it is fully overwritten before encoding.
+        self._request: Dict[str, Any] = {"tool": None, "args": None}
+        # msgpack requests are encoded in place here, behind a 4-byte header.
+        self._scratch = bytearray(4096)
         self._process: Optional[subprocess.Popen] = None
-        self._stack: Optional[AsyncExitStack] = None
+        # Raw pipe descriptors used by the sync senders while run() is active.
+        self._stdin_fd: Optional[int] = None
+        self._stdout_pipe: Optional[_PipeReader] = None
+        self._read_transport: Optional[asyncio.ReadTransport] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        # Serializes request/response exchanges on the async pipes.
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def refresh_env(cls) -> None:
+        """Re-snapshot os.environ for servers started after this call."""
+        global _BASE_ENV
+        _BASE_ENV = os.environ.copy()
+
+    def _child_env(self) -> Dict[str, str]:
+        """Build the server environment from the snapshot and overrides."""
+        return {**_BASE_ENV, **self.env, FRAMING_ENV_VAR: self.framing}
+
+    def _request_parts(self, request: Dict[str, Any]) -> Sequence[bytes]:
+        """
+        Encode a single request for the wire.
+
+        msgpack frames are written into the runner's scratch buffer rather
+        than a fresh bytes object, so the result is only valid until the
+        next call; callers write it out immediately.
+        """
+        if self.framing != "msgpack":
+            return encode_frame_parts(request, self.framing)
+        scratch = self._scratch
+        msgpack_encoder.encode_into(request, scratch, 4)
+        scratch[:4] = (len(scratch) - 4).to_bytes(4, "little")
+        return (scratch,)
+
+    def _spawn_sync(self) -> subprocess.Popen:
+        """Start the server process with binary pipes."""
+        env = self._child_env()
+        process = subprocess.Popen(
+            [self.command] + self.args,
+            executable=resolve_executable(self.command, env.get("PATH")),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if self.capture_stderr else subprocess.DEVNULL,
+            env=env,
+            cwd=self.working_dir,
+            close_fds=CLOSE_FDS,
+        )
+        if self.capture_stderr:
+            start_stderr_drain(process, self.stderr_tail)
+        return process
 
     @contextmanager
     def run(self) -> ContextManager[Optional[subprocess.Popen]]:
@@ -48,54 +190,76 @@ class ServerRunner:
         Yields:
             The Popen process instance
         """
-        import os
-
-        env = os.environ.copy()
-        env.update(self.env)
-
         try:
-            self._process = subprocess.Popen(
-                [self.command] + self.args,
-                stdin=subprocess.PIPE,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                env=env,
-                cwd=self.working_dir,
-            )
+            self._process = self._spawn_sync()
+            self._stdin_fd = self._process.stdin.fileno()
+            self._stdout_pipe = _PipeReader(self._process.stdout.fileno())
             yield self._process
         finally:
-            if self._process and self._process.poll() is None:
-                self._process.terminate()
-                try:
-                    self._process.wait(timeout=5)
-                except subprocess.TimeoutExpired:
-                    self._process.kill()
-                    self._process.wait()
+            if self._process:
+                stop_process(self._process)
             self._process = None
+            self._stdin_fd = None
+            self._stdout_pipe = None
 
     async def run_async(self) -> None:
-        """Start the server process asynchronously."""
-        import os
-
-        env = os.environ.copy()
-        env.update(self.env)
-
-        self._stack = AsyncExitStack()
-        await self._stack.__aenter__()
-
-        self._process = await self._stack.enter_async_context(
-            asyncio.subprocess.create_subprocess_exec(
-                self.command,
-                *self.args,
-                stdin=asyncio.subprocess.PIPE,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-                env=env,
-                cwd=self.working_dir,
-            )
+        """
+        Start the server process asynchronously.
+
+        The fork/exec happens in a worker thread so that starting many
+        servers at once does not stall the event loop; the pipes are then
+        attached to the loop as a StreamReader/StreamWriter pair.
+        """
+        process = self._process = await asyncio.to_thread(self._spawn_sync)
+
+        loop = asyncio.get_running_loop()
+        reader = asyncio.StreamReader(limit=PIPE_BUFFER_SIZE)
+        self._read_transport, _ = await loop.connect_read_pipe(
+            lambda: asyncio.StreamReaderProtocol(reader), process.stdout
+        )
+        write_transport, write_protocol = await loop.connect_write_pipe(
+            asyncio.streams.FlowControlMixin, process.stdin
         )
 
+        self._reader = reader
+        self._writer = asyncio.StreamWriter(write_transport, write_protocol, None, loop)
+
+    @property
+    def running(self) -> bool:
+        """Whether the server process can take another request."""
+        if self._process is None or self._process.poll() is not None:
+            return False
+        # Same rules as stdio_protocol.process_running, for these pipes.
+        if self._writer is not None and self._writer.is_closing():
+            return False
+        return self._reader is None or not self._reader.at_eof()
+
+    def _abandon(self) -> None:
+        """Drop a server left mid-exchange; see stdio_protocol.exchange."""
+        if self._writer:
+            self._writer.close()
+        if self._process and self._process.poll() is None:
+            self._process.kill()
+
+    async def start(self) -> None:
+        """Start the server process for async use; same as run_async."""
+        await self.run_async()
+
+    async def stop(self) -> None:
+        """Stop a server started with run_async and close its pipes."""
+        if self._writer:
+            # Close stdin first so the server sees EOF before it is terminated.
+            self._writer.close()
+        if self._read_transport:
+            self._read_transport.close()
+        if self._process:
+            # Terminate, then kill after 5 seconds, without blocking the loop.
+            await asyncio.to_thread(stop_process, self._process)
+        self._process = None
+        self._read_transport = None
+        self._reader = None
+        self._writer = None
+
     async def __aenter__(self):
         """Async context manager entry."""
         await self.run_async()
@@ -103,10 +267,7 @@ class ServerRunner:
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit."""
-        if self._stack:
-            await self._stack.__aexit__(exc_type, exc_val, exc_tb)
-        self._process = None
-        self._stack = None
+        await self.stop()
 
     def send_tool_call(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -122,28 +283,81 @@ class ServerRunner:
         Returns:
             Parsed JSON response from the server
         """
-        if not self._process:
+        if self._stdin_fd is None or self._stdout_pipe is None:
             raise RuntimeError("Server process not running")
 
-        request = json.dumps({"tool": tool_name, "args": args})
-        self._process.stdin.write(request + "\n")
-        self._process.stdin.flush()
+        request = self._request
+        request["tool"] = tool_name
+        request["args"] = args
+        _writev_all(self._stdin_fd, self._request_parts(request))
 
         # Read response
-        response_line = self._process.stdout.readline()
-        return json.loads(response_line)
+        response = self._stdout_pipe.read_frame(self.framing)
+        return decode_frame(response, self.framing)
 
     async def send_tool_call_async(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
         """Async version of send_tool_call."""
-        if not self._process:
+        if not self._writer or not self._reader:
             raise RuntimeError("Server process not running")
 
-        request = json.dumps({"tool": tool_name, "args": args}) + "\n"
-        self._process.stdin.write(request)
-        await self._process.stdin.drain()
+        async with self._lock:
+            request = self._request
+            request["tool"] = tool_name
+            request["args"] = args
+            try:
+                self._writer.writelines(self._request_parts(request))
+                await self._writer.drain()
+                response = await read_frame(self._reader, self.framing)
+            except BaseException:
+                self._abandon()
+                raise
+        return decode_frame(response, self.framing)
+
+    async def send_tool_calls_async(self, calls: List[Tuple[str, Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Send several tool calls in one write and collect their responses.
 
-        response_line = await self._process.stdout.readline()
-        return json.loads(response_line)
+        All requests are written back to back and drained once while the
+        responses are read in order; the pipe is FIFO, so response i
+        answers call i.
+
+        Args:
+            calls: (tool_name, args) pairs
+
+        Returns:
+            Parsed responses, in the same order as calls
+        """
+        if not self._writer or not self._reader:
+            raise RuntimeError("Server process not running")
+
+        framing = self.framing
+        request = self._request
+        frames = []
+        for tool_name, args in calls:
+            request["tool"] = tool_name
+            request["args"] = args
+            frames.extend(encode_frame_parts(request, framing))
+
+        writer = self._writer
+        reader = self._reader
+
+        async def send() -> None:
+            writer.writelines(frames)
+            await writer.drain()
+
+        async with self._lock:
+            # Responses are read while the batch is still being written: a
+            # server answering a large batch fills its stdout pipe and stops
+            # reading stdin until someone drains it.
+            sending = asyncio.ensure_future(send())
+            try:
+                responses = [await read_frame(reader, framing) for _ in calls]
+                await sending
+            except BaseException:
+                sending.cancel()
+                self._abandon()
+                raise
+        return [decode_frame(response, framing) for response in responses]
 
     def get_tools(self) -> List[Dict[str, Any]]:
         """
@@ -152,15 +366,80 @@ class ServerRunner:
         Returns:
             List of tool definitions
         """
-        if not self._process:
+        if self._stdin_fd is None or self._stdout_pipe is None:
             raise RuntimeError("Server process not running")
 
-        request = json.dumps({"action": "list_tools"}) + "\n"
-        self._process.stdin.write(request)
-        self._process.stdin.flush()
+        _write_all(self._stdin_fd, LIST_TOOLS_FRAMES[self.framing])
+
+        response = self._stdout_pipe.read_frame(self.framing)
+        return decode_frame(response, self.framing)
+
+
+class ServerRunnerPool:
+    """Keep several server processes warm and hand them out one at a time."""
+
+    def __init__(
+        self,
+        command: str,
+        args: Optional[List[str]] = None,
+        env: Optional[Dict[str, str]] = None,
+        working_dir: Optional[Path] = None,
+        size: int = 4,
+        framing: Optional[str] = None,
+        capture_stderr: bool = False,
+    ):
+        """
+        Initialize the pool.
+
+        Args:
+            command: Executable command to run the server
+            args: Arguments to pass to the command
+            env: Environment variables for the server
+            working_dir: Working directory for the server processes
+            size: Number of server processes to keep running
+            framing: Wire framing ("line", "length" or "msgpack"); defaults
+                to $MEDIA_POSTER_FRAMING, then "line"
+            capture_stderr: Keep each server's last stderr lines
+        """
+        self._pool: WorkerPool[ServerRunner] = WorkerPool([
+            ServerRunner(command, args, env, working_dir, framing, capture_stderr)
+            for _ in range(max(1, size))
+        ])
 
-        response_line = self._process.stdout.readline()
-        return json.loads(response_line)
+    async def start(self) -> None:
+        """Start all server processes concurrently."""
+        await self._pool.start()
+
+    async def stop(self) -> None:
+        """Stop all server processes."""
+        await self._pool.stop()
+
+    async def acquire(self) -> ServerRunner:
+        """Wait for an idle runner, replacing its process if it exited."""
+        return await self._pool.acquire()
+
+    async def release(self, runner: ServerRunner) -> None:
+        """Return a runner to the pool."""
+        self._pool.release(runner)
+
+    async def call(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Call a tool on the next idle runner."""
+        return await self._pool.call(ServerRunner.send_tool_call_async, tool_name, args)
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit."""
+        await self.stop()
+
+
+@functools.lru_cache(maxsize=None)
+def _default_server(module: ModuleType) -> Any:
+    """Instantiate a module's Server class once for tool discovery."""
+    return module.Server()
 
 
 class DirectToolCaller:
@@ -176,15 +455,20 @@ class DirectToolCaller:
         """
         self.module_path = module_path
         self.server = server_instance
-        self._module = None
+
+        # Tool table for the inspected server, stored as parallel lists and
+        # built once: a server's methods do not change between calls.
+        self._indexed_server: Any = None
+        self._tool_names: List[str] = []
+        self._tool_descriptions: List[str] = []
+        self._tool_schemas: List[Dict[str, Any]] = []
+        self._callables: List[Callable[..., Any]] = []
+        self._tool_index: Dict[str, int] = {}
+        self._tools_cache: Optional[List[Dict[str, Any]]] = None
 
     def _load_module(self):
         """Load the server module."""
-        import importlib
-
-        if not self._module:
-            self._module = importlib.import_module(self.module_path)
-        return self._module
+        return load_server_module(self.module_path)
 
     def get_tools(self) -> List[Dict[str, Any]]:
         """
@@ -194,6 +478,7 @@ class DirectToolCaller:
             List of tool definitions with name, description, and input_schema
         """
         module = self._load_module()
+        registered = TOOL_REGISTRY.get(module.__name__)
 
         # Try different common patterns for tool listing
         if hasattr(module, "list_tools"):
@@ -202,28 +487,57 @@ class DirectToolCaller:
             return module.get_tools()
         elif hasattr(module, "tools"):
             return module.tools
+        elif registered:
+            # Tools declared with tool_registry.tool; no reflection needed.
+            # The registry is shared by every server module in the process,
+            # so only this module's entries are listed.
+            return [
+                {"name": entry.name, "description": entry.description, "input_schema": entry.input_schema}
+                for entry in registered.values()
+            ]
         else:
             # Fallback: try to discover tools from server methods
-            server = self.server or (module.Server() if hasattr(module, "Server") else None)
+            server = self.server or (_default_server(module) if hasattr(module, "Server") else None)
             if server:
                 return self._discover_tools(server)
             return []
 
-    def _discover_tools(self, server) -> List[Dict[str, Any]]:
-        """Discover tools by inspecting server methods."""
-        tools = []
-        for attr_name in dir(server):
+    def _index_tools(self, server) -> None:
+        """Build the tool table for server unless it is already indexed."""
+        if server is self._indexed_server:
+            return
+
+        names: List[str] = []
+        descriptions: List[str] = []
+        schemas: List[Dict[str, Any]] = []
+        callables: List[Callable[..., Any]] = []
+        for attr_name, attr in inspect.getmembers(server, callable):
             if attr_name.startswith("_"):
                 continue
-            attr = getattr(server, attr_name)
-            if callable(attr):
-                # Check if it looks like a tool (not internal methods)
-                tools.append({
-                    "name": attr_name,
-                    "description": getattr(attr, "__doc__", f"Tool: {attr_name}") or f"Tool: {attr_name}",
-                    "input_schema": getattr(attr, "input_schema", {"type": "object", "properties": {}}),
-                })
-        return tools
+            names.append(attr_name)
+            descriptions.append(getattr(attr, "__doc__", None) or f"Tool: {attr_name}")
+            schemas.append(getattr(attr, "input_schema", {"type": "object", "properties": {}}))
+            callables.append(attr)
+
+        self._tool_names = names
+        self._tool_descriptions = descriptions
+        self._tool_schemas = schemas
+        self._callables = callables
+        self._tool_index = {name: i for i, name in enumerate(names)}
+        self._tools_cache = None
+        self._indexed_server = server
+
+    def _discover_tools(self, server) -> List[Dict[str, Any]]:
+        """Discover tools by inspecting server methods."""
+        self._index_tools(server)
+        if self._tools_cache is None:
+            self._tools_cache = [
+                {"name": name, "description": description, "input_schema": schema}
+                for name, description, schema in zip(
+                    self._tool_names, self._tool_descriptions, self._tool_schemas
+                )
+            ]
+        return self._tools_cache
 
     def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Any:
         """
@@ -241,10 +555,19 @@ class DirectToolCaller:
         # Try different calling patterns
         if self.server:
             # Call on pre-instantiated server
+            self._index_tools(self.server)
+            index = self._tool_index.get(tool_name)
+            if index is not None:
+                return self._callables[index](**args)
             attr = getattr(self.server, tool_name, None)
             if callable(attr):
                 return attr(**args)
 
+        # Try a tool registered with tool_registry.tool, under its own name
+        entry = TOOL_REGISTRY.get(module.__name__, {}).get(tool_name)
+        if entry is not None:
+            return entry.fn(**args)
+
         # Try module-level function
         attr = getattr(module, tool_name, None)
         if callable(attr):
@@ -287,8 +610,6 @@ def create_server_runner(
 
 def main():
     """CLI interface for server runner."""
-    import argparse
-
     parser = argparse.ArgumentParser(description="Run server process for evaluation")
     parser.add_argument("command", help="Command to run")
     parser.add_argument("--args", nargs="+", help="Command arguments")
@@ -311,9 +632,7 @@ def main():
         print("Press Ctrl+C to stop...")
 
         try:
-            while process.poll() is None:
-                import time
-                time.sleep(1)
+            process.wait()
         except KeyboardInterrupt:
             print("\nStopping server...")
 
@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Optional ahead-of-time build of the hot harness modules with mypyc.
+
+Compiles connections.py, evaluation.py and the stdio_protocol.py helpers
+they share into C extensions placed next to the sources:
+
+    pip install mypy setuptools
+    python setup.py build_ext --inplace
+
+Any `import connections` / `import evaluation` then loads the compiled
+module, and the .py files remain the pure-Python fallback. Running
+`python evaluation.py` directly always executes the source; to use the
+compiled build from the CLI, go through the module instead:
+
+    python -c "import asyncio, evaluation; asyncio.run(evaluation.main())" eval.xml ...
+
+Delete the generated .so/.pyd files to go back to pure Python.
+"""
+
+from mypyc.build import mypycify
+from setuptools import setup
+
+setup(
+    name="media-poster-script",
+    ext_modules=mypycify(["connections.py", "evaluation.py", "stdio_protocol.py"]),
+)
@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Stdio Protocol - Wire format and process helpers for stdio tool servers.
+
+connections.py, evaluation.py, server_runner.py and tool_caller.py all
+talk to the same servers over stdin/stdout. The framing, the JSON and
+msgpack codecs, the process-spawning details, the server pool and the
+module loading for direct calls live here so that every caller agrees on them.
+"""
+
+import asyncio
+import contextlib
+import importlib
+import json
+import os
+import shutil
+import subprocess
+import sys
+import threading
+from types import ModuleType
+from typing import Any, Awaitable, BinaryIO, Callable, Deque, Dict, Generic, List, Optional, Protocol, Tuple, TypeVar
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore[assignment]
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # type: ignore[assignment]
+
+
+if orjson is not None:
+    loads = orjson.loads
+else:
+    loads = json.loads
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize obj as JSON, accepting everything json.dumps does."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # orjson refuses some values json handles, e.g. ints over 64 bits.
+            pass
+    return json.dumps(obj).encode()
+
+
+def dumps_line(obj: Any) -> bytes:
+    """Serialize obj as one newline-terminated JSON line."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    return json.dumps(obj).encode() + b"\n"
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Serialize obj as indented JSON text for display and reports."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode()
+        except TypeError:
+            pass
+    return json.dumps(obj, indent=2)
+
+
+# Large enough to hold a typical media metadata response in one read.
+PIPE_BUFFER_SIZE = 1 << 20
+
+
+def enlarge_pipe(process: asyncio.subprocess.Process, size: int = PIPE_BUFFER_SIZE) -> None:
+    """Grow the kernel buffer of the server's stdout pipe (Linux only)."""
+    try:
+        import fcntl
+
+        pipe = getattr(process.stdout, "_transport").get_extra_info("pipe")
+        fcntl.fcntl(pipe.fileno(), getattr(fcntl, "F_SETPIPE_SZ", 1031), size)
+    except (ImportError, AttributeError, OSError):
+        # Not Linux, or the size exceeds /proc/sys/fs/pipe-max-size.
+        pass
+
+
+# Wire framing for stdio servers: "line" is newline-delimited JSON,
+# "length" prefixes each JSON message with its size as 4 little-endian
+# bytes, and "msgpack" uses the same prefix around a msgpack body (requires
+# msgspec on both ends). Old JSON servers keep working because "line" stays
+# the default; the chosen framing is passed to the server in the same
+# environment variable so it can answer in kind.
+FRAMING_ENV_VAR = "MEDIA_POSTER_FRAMING"
+FRAMINGS = ("line", "length", "msgpack")
+
+# None when msgspec is missing; resolve_framing rejects "msgpack" then.
+msgpack_encoder: Any = None
+if msgspec is not None:
+    msgpack_encoder = msgspec.msgpack.Encoder()
+    _msgpack_encode = msgpack_encoder.encode
+    _msgpack_decode = msgspec.msgpack.Decoder().decode
+
+
+def resolve_framing(framing: Optional[str]) -> str:
+    """Pick the framing from the argument or environment, defaulting to "line"."""
+    framing = framing or os.environ.get(FRAMING_ENV_VAR) or "line"
+    if framing not in FRAMINGS:
+        raise ValueError(f"Unsupported framing: {framing}. Use one of {', '.join(FRAMINGS)}")
+    if framing == "msgpack" and msgspec is None:
+        raise ValueError("msgpack framing requires msgspec (pip install msgspec)")
+    return framing
+
+
+def encode_frame_parts(obj: Any, framing: str) -> Tuple[bytes, ...]:
+    """Encode a message as its wire pieces, for a gathered write."""
+    if framing == "line":
+        return (dumps_line(obj),)
+    body = _msgpack_encode(obj) if framing == "msgpack" else dumps(obj)
+    return len(body).to_bytes(4, "little"), body
+
+
+def encode_frame(obj: Any, framing: str) -> bytes:
+    """Encode a message and wrap it for the wire."""
+    if framing == "line":
+        return dumps_line(obj)
+    return b"".join(encode_frame_parts(obj, framing))
+
+
+def decode_frame(body: bytes, framing: str) -> Any:
+    """Decode a message body read from the wire."""
+    if framing == "msgpack":
+        return _msgpack_decode(body)
+    return loads(body)
+
+
+async def _read_long_line(reader: asyncio.StreamReader) -> bytes:
+    """Read a line longer than the reader's limit, one buffer-full at a time."""
+    chunks = []
+    while True:
+        try:
+            chunks.append(await reader.readuntil(b"\n"))
+            return b"".join(chunks)
+        except asyncio.LimitOverrunError as error:
+            # error.consumed bytes are buffered and hold no complete line yet.
+            chunks.append(await reader.readexactly(error.consumed))
+
+
+async def read_frame(reader: asyncio.StreamReader, framing: str) -> bytes:
+    """Read one message body from the wire."""
+    if framing == "line":
+        try:
+            return await reader.readuntil(b"\n")
+        except asyncio.LimitOverrunError:
+            # The reader's limit only sizes its buffer; responses may be longer.
+            return await _read_long_line(reader)
+    header = await reader.readexactly(4)
+    return await reader.readexactly(int.from_bytes(header, "little"))
+
+
+def read_exactly(stream: BinaryIO, size: int) -> bytes:
+    """Read exactly size bytes from a blocking stream."""
+    chunks = []
+    while size:
+        chunk = stream.read(size)
+        if not chunk:
+            raise EOFError("Server closed the pipe in the middle of a frame")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b"".join(chunks)
+
+
+def read_frame_sync(stream: BinaryIO, framing: str) -> bytes:
+    """Read one message body from a blocking stream."""
+    if framing == "line":
+        return stream.readline()
+    header = read_exactly(stream, 4)
+    return read_exactly(stream, int.from_bytes(header, "little"))
+
+
+# Constant requests are encoded once per framing at import time.
+LIST_TOOLS_FRAMES: Dict[str, bytes] = {
+    framing: encode_frame({"action": "list_tools"}, framing)
+    for framing in FRAMINGS
+    if framing != "msgpack" or msgspec is not None
+}
+
+
+def format_tool_result(result: Any) -> str:
+    """Render a decoded tool result as text for the model."""
+    return dumps(result).decode() if isinstance(result, (dict, list)) else str(result)
+
+
+def raw_tool_response(response: bytes, framing: str) -> str:
+    """
+    Turn an undecoded tool response into text for the model.
+
+    A JSON response is only parsed when it may be an error envelope or is a
+    bare JSON string; everything else is passed through as-is. msgpack
+    bodies are not text, so they are always decoded and rendered as the
+    same JSON text the other framings would carry.
+    """
+    if not response:
+        raise EOFError("Server closed its stdout without responding")
+    if framing == "msgpack":
+        result = decode_frame(response, framing)
+        if isinstance(result, dict) and "error" in result:
+            raise RuntimeError(result["error"])
+        return result if isinstance(result, str) else dumps(result).decode()
+    response = response.rstrip(b"\r\n")
+    if not response:
+        raise RuntimeError("Server returned an empty response")
+    if b'"error"' in response:
+        result = loads(response)
+        if isinstance(result, dict) and "error" in result:
+            raise RuntimeError(result["error"])
+    if response.startswith(b'"'):
+        text: str = loads(response)
+        return text
+    return response.decode()
+
+
+# subprocess only uses the posix_spawn fast path (no copy of the parent's
+# address space) when the executable is given as a path and close_fds,
+# pass_fds, cwd, preexec_fn and start_new_session are all left unset.
+# close_fds=False is safe because Python opens its own descriptors
+# non-inheritable (PEP 446); any fd this process opens through other means
+# must set O_CLOEXEC to stay out of the server.
+def load_server_module(module_path: str) -> ModuleType:
+    """
+    Import a server module for direct calls.
+
+    sys.modules already holds every imported module, so it is checked first
+    and import_module's lock is only taken on the first load.
+
+    Args:
+        module_path: Dot-separated path to server module (e.g., "media_poster.server")
+
+    Returns:
+        The imported module
+    """
+    module = sys.modules.get(module_path)
+    if module is None:
+        module = importlib.import_module(module_path)
+    return module
+
+
+CLOSE_FDS = os.name != "posix"
+
+
+def resolve_executable(command: str, path: Optional[str]) -> str:
+    """
+    Resolve command against the child's PATH, leaving it unchanged if not found.
+
+    Args:
+        command: Command name or path
+        path: PATH from the environment the server will run with
+
+    Returns:
+        Path to the executable, or command itself
+    """
+    return shutil.which(command, path=path) or command
+
+
+# Servers' stderr goes to /dev/null unless capture_stderr is set. An
+# undrained stderr pipe fills up (64 KiB on Linux) and then blocks the
+# server mid-request, so captured output is read continuously by a
+# background thread and only the most recent lines are kept.
+STDERR_TAIL_LINES = 200
+
+
+def _drain_stderr(stream: BinaryIO, tail: "Deque[str]") -> None:
+    """Read a server's stderr until EOF, keeping the last lines in tail."""
+    try:
+        for line in stream:
+            tail.append(line.decode(errors="replace").rstrip("\n"))
+    except (OSError, ValueError):
+        # The pipe was closed while the server was being stopped.
+        pass
+
+
+def start_stderr_drain(process: "subprocess.Popen[bytes]", tail: "Deque[str]") -> None:
+    """Start draining process.stderr into tail in a daemon thread."""
+    threading.Thread(target=_drain_stderr, args=(process.stderr, tail), daemon=True).start()
+
+
+def stop_process(process: "subprocess.Popen[bytes]") -> None:
+    """Terminate a server process, killing it if it hangs, and close its pipes."""
+    if process.poll() is None:
+        process.terminate()
+        try:
+            process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+    for pipe in (process.stdin, process.stdout, process.stderr):
+        if pipe:
+            pipe.close()
+
+
+async def stop_async_process(process: asyncio.subprocess.Process) -> None:
+    """
+    Stop an asyncio server process and release its pipes.
+
+    stdin is closed first so the server sees EOF before it is terminated,
+    and is closed even when the process has already exited, so a crashed
+    server does not leave its transports open.
+    """
+    if process.stdin is not None:
+        process.stdin.close()
+    if process.returncode is None:
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+
+def process_running(process: Optional[asyncio.subprocess.Process]) -> bool:
+    """
+    Whether an asyncio server process can take another request.
+
+    An exited server is seen at EOF on stdout before it is reaped, and one
+    abandoned by exchange() has its stdin closed, so both count as down.
+    """
+    return (
+        process is not None
+        and process.returncode is None
+        and process.stdin is not None
+        and not process.stdin.is_closing()
+        and process.stdout is not None
+        and not process.stdout.at_eof()
+    )
+
+
+def abandon_process(process: asyncio.subprocess.Process) -> None:
+    """Close a server's stdin and kill it without waiting for it to exit."""
+    if process.stdin is not None:
+        process.stdin.close()
+    if process.returncode is None:
+        with contextlib.suppress(ProcessLookupError):
+            process.kill()
+
+
+async def exchange(process: asyncio.subprocess.Process, request: bytes, framing: str) -> bytes:
+    """
+    Write one framed request to a server and read back its response body.
+
+    Requests and responses share one pipe pair, so callers hold a lock
+    around each exchange. If it fails or is cancelled after the request is
+    written, the response is still in flight and the next read would get
+    it instead of its own; the server is abandoned then, and whoever uses
+    it next starts a new one.
+    """
+    assert process.stdin is not None and process.stdout is not None
+    try:
+        process.stdin.write(request)
+        await process.stdin.drain()
+        return await read_frame(process.stdout, framing)
+    except BaseException:
+        abandon_process(process)
+        raise
+
+
+class PoolWorker(Protocol):
+    """A server connection that WorkerPool can start, stop and inspect."""
+
+    @property
+    def running(self) -> bool: ...
+
+    async def start(self) -> None: ...
+
+    async def stop(self) -> None: ...
+
+
+Worker = TypeVar("Worker", bound=PoolWorker)
+Result = TypeVar("Result")
+
+
+class WorkerPool(Generic[Worker]):
+    """
+    Hand out server workers one at a time.
+
+    start() launches every worker up front. A worker whose server has
+    exited is stopped and started again when it is next acquired; if that
+    restart fails the error goes to the acquirer and the worker stays in
+    the pool, so the next acquire tries again.
+    """
+
+    def __init__(self, workers: List[Worker]) -> None:
+        self.workers = workers
+        self._idle: "asyncio.Queue[Worker]" = asyncio.Queue()
+        for worker in workers:
+            self._idle.put_nowait(worker)
+
+    async def start(self) -> None:
+        """Start all workers concurrently."""
+        await asyncio.gather(*(worker.start() for worker in self.workers))
+
+    async def stop(self) -> None:
+        """Stop all workers."""
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+
+    async def acquire(self) -> Worker:
+        """Wait for an idle worker, restarting it first if its server exited."""
+        worker = await self._idle.get()
+        if not worker.running:
+            try:
+                # stop() releases whatever the exited process left open.
+                await worker.stop()
+                await worker.start()
+            except BaseException:
+                self._idle.put_nowait(worker)
+                raise
+        return worker
+
+    def release(self, worker: Worker) -> None:
+        """Return a worker to the pool; call this in a finally block."""
+        self._idle.put_nowait(worker)
+
+    async def call(self, method: Callable[..., Awaitable[Result]], *args: Any) -> Result:
+        """
+        Run method(worker, *args) on the next idle worker.
+
+        Args:
+            method: Unbound worker method, e.g. StdioConnection.call_tool
+            *args: Arguments passed after the worker
+
+        Returns:
+            The method's result
+        """
+        worker = await self.acquire()
+        try:
+            return await method(worker, *args)
+        finally:
+            self.release(worker)
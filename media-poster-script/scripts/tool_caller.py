@@ -8,46 +8,72 @@ directly through subprocess or import, bypassing the MCP protocol.
 
 import argparse
 import json
+import os
+import re
 import subprocess
 import sys
+from collections import deque
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Deque, Dict, List, Optional
+
+from stdio_protocol import (
+    CLOSE_FDS, FRAMING_ENV_VAR, LIST_TOOLS_FRAMES, STDERR_TAIL_LINES, decode_frame, dumps_pretty,
+    encode_frame, load_server_module, read_frame_sync, resolve_executable, resolve_framing,
+    start_stderr_drain, stop_process,
+)
 
 
 class ToolCaller:
     """Direct tool invocation interface."""
 
-    def __init__(self, server_command: str, server_args: Optional[List[str]] = None):
+    def __init__(
+        self,
+        server_command: str,
+        server_args: Optional[List[str]] = None,
+        framing: Optional[str] = None,
+        capture_stderr: bool = False,
+    ):
         """
         Initialize the tool caller.
 
         Args:
             server_command: Command to start the server
             server_args: Arguments for the server command
+            framing: Wire framing ("line", "length" or "msgpack"); defaults
+                to $MEDIA_POSTER_FRAMING, then "line"
+            capture_stderr: Keep the server's last stderr lines in
+                stderr_tail instead of discarding them
         """
         self.server_command = server_command
         self.server_args = server_args or []
+        self.framing = resolve_framing(framing)
+        self.capture_stderr = capture_stderr
+        self.stderr_tail: Deque[str] = deque(maxlen=STDERR_TAIL_LINES)
+        # Reused for every tool call; it is fully overwritten before encoding.
+        self._request: Dict[str, Any] = {"tool": None, "args": None}
         self._process: Optional[subprocess.Popen] = None
 
     def start(self) -> None:
         """Start the server process."""
+        env = os.environ.copy()
+        env[FRAMING_ENV_VAR] = self.framing
+
         self._process = subprocess.Popen(
             [self.server_command] + self.server_args,
+            executable=resolve_executable(self.server_command, env.get("PATH")),
             stdin=subprocess.PIPE,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
+            stderr=subprocess.PIPE if self.capture_stderr else subprocess.DEVNULL,
+            env=env,
+            close_fds=CLOSE_FDS,
         )
+        if self.capture_stderr:
+            start_stderr_drain(self._process, self.stderr_tail)
 
     def stop(self) -> None:
         """Stop the server process."""
-        if self._process and self._process.poll() is None:
-            self._process.terminate()
-            try:
-                self._process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                self._process.kill()
-                self._process.wait()
+        if self._process:
+            stop_process(self._process)
         self._process = None
 
     def call_tool(self, tool_name: str, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -64,24 +90,25 @@ class ToolCaller:
         if not self._process:
             raise RuntimeError("Server not running. Call start() first.")
 
-        request = json.dumps({"tool": tool_name, "args": args}) + "\n"
-        self._process.stdin.write(request)
+        request = self._request
+        request["tool"] = tool_name
+        request["args"] = args
+        self._process.stdin.write(encode_frame(request, self.framing))
         self._process.stdin.flush()
 
-        response_line = self._process.stdout.readline()
-        return json.loads(response_line)
+        response = read_frame_sync(self._process.stdout, self.framing)
+        return decode_frame(response, self.framing)
 
     def list_tools(self) -> List[Dict[str, Any]]:
         """List available tools from the server."""
         if not self._process:
             raise RuntimeError("Server not running. Call start() first.")
 
-        request = json.dumps({"action": "list_tools"}) + "\n"
-        self._process.stdin.write(request)
+        self._process.stdin.write(LIST_TOOLS_FRAMES[self.framing])
         self._process.stdin.flush()
 
-        response_line = self._process.stdout.readline()
-        return json.loads(response_line)
+        response = read_frame_sync(self._process.stdout, self.framing)
+        return decode_frame(response, self.framing)
 
 
 class DirectToolCaller:
@@ -95,15 +122,10 @@ class DirectToolCaller:
             module_path: Dot-separated path to server module
         """
         self.module_path = module_path
-        self._module = None
 
     def _load_module(self):
         """Load the server module."""
-        import importlib
-
-        if not self._module:
-            self._module = importlib.import_module(self.module_path)
-        return self._module
+        return load_server_module(self.module_path)
 
     def get_tools(self) -> List[Dict[str, Any]]:
         """Get available tools."""
@@ -134,6 +156,11 @@ class DirectToolCaller:
         raise ValueError(f"Tool {tool_name} not found in {self.module_path}")
 
 
+# One comma-separated key=value pair, with surrounding whitespace trimmed
+# from both sides; values may contain "=", pairs without one are skipped.
+_KV_RE = re.compile(r"\s*([^=,]*?)\s*=\s*([^,]*?)\s*(?:,|$)")
+
+
 def parse_tool_input(input_str: str) -> Dict[str, Any]:
     """Parse JSON or key=value input into a dictionary."""
     input_str = input_str.strip()
@@ -148,19 +175,13 @@ def parse_tool_input(input_str: str) -> Dict[str, Any]:
         pass
 
     # Fall back to key=value parsing
-    result = {}
-    for pair in input_str.split(","):
-        if "=" in pair:
-            key, value = pair.split("=", 1)
-            result[key.strip()] = value.strip()
-
-    return result
+    return dict(_KV_RE.findall(input_str))
 
 
 def format_tool_result(result: Any) -> str:
     """Format tool result for display."""
     if isinstance(result, (dict, list)):
-        return json.dumps(result, indent=2)
+        return dumps_pretty(result)
     return str(result)
 
 
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Tool Registry - Declare server tools without reflection.
+
+Servers decorate their tool functions with @tool, which records a
+definition in TOOL_REGISTRY under the defining module's name.
+DirectToolCaller lists and calls a server module's registered tools
+instead of scanning the server's attributes with dir().
+"""
+
+from typing import Any, Callable, Dict, NamedTuple, Optional
+
+
+DEFAULT_INPUT_SCHEMA: Dict[str, Any] = {"type": "object", "properties": {}}
+
+
+class ToolDef(NamedTuple):
+    """A registered tool definition."""
+
+    name: str
+    description: str
+    input_schema: Dict[str, Any]
+    fn: Callable[..., Any]
+
+
+# module name -> tool name -> definition; one registry serves every server
+# module imported into the process.
+TOOL_REGISTRY: Dict[str, Dict[str, ToolDef]] = {}
+
+
+def tool(
+    func: Optional[Callable[..., Any]] = None,
+    *,
+    name: Optional[str] = None,
+    input_schema: Optional[Dict[str, Any]] = None,
+) -> Any:
+    """
+    Register a function as a tool.
+
+    Usable bare (@tool) or with options (@tool(input_schema={...})).
+
+    Args:
+        func: Function to register
+        name: Tool name (defaults to the function name)
+        input_schema: JSON schema for the tool input (defaults to the
+            function's input_schema attribute, then an empty object schema)
+
+    Returns:
+        The function unchanged, or a decorator when called with options
+    """
+
+    def register(fn: Callable[..., Any]) -> Callable[..., Any]:
+        tool_name = name or fn.__name__
+        TOOL_REGISTRY.setdefault(fn.__module__, {})[tool_name] = ToolDef(
+            name=tool_name,
+            description=fn.__doc__ or f"Tool: {tool_name}",
+            input_schema=input_schema or getattr(fn, "input_schema", DEFAULT_INPUT_SCHEMA),
+            fn=fn,
+        )
+        return fn
+
+    if func is not None:
+        return register(func)
+    return register